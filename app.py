@@ -1,10 +1,23 @@
 import sys
 import os
 import shutil
+import errno
 import json
+import time
+import heapq
+import hashlib
+from collections import Counter
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+try:
+    import numpy as np
+except ImportError:
+    np = None
 from PyQt6.QtWidgets import QApplication, QWidget, QVBoxLayout, QPushButton, QFileDialog, QLineEdit, QHBoxLayout, QMessageBox, QLabel, QMenuBar, QTextEdit, QComboBox, QCheckBox, QDialog
-from PyQt6.QtGui import QAction, QIcon, QPixmap, QActionGroup
-from PyQt6.QtCore import Qt, QEvent, QSize, QStandardPaths
+from PyQt6.QtGui import QAction, QIcon, QPixmap, QActionGroup, QImage, QImageReader, QImageIOHandler
+from PyQt6.QtCore import Qt, QEvent, QSize, QStandardPaths, QTimer, QThread, pyqtSignal
 
 def resource_path(relative_path):
     try:
@@ -19,6 +32,797 @@ def get_settings_path():
         os.makedirs(config_dir)
     return os.path.join(config_dir, 'settings.json')
 
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity else rate
+        self.tokens = self.capacity
+        self.last = time.monotonic()
+
+    def consume(self, amount):
+        if self.rate <= 0:
+            return 0
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        # Tokens may go negative for items larger than the bucket, the wait is then proportional to the debt
+        self.tokens -= amount
+        if self.tokens < 0:
+            return -self.tokens / self.rate
+        return 0
+
+def lower_thread_priority():
+    # Only the calling thread is lowered, the GUI and later jobs keep their normal priority
+    if sys.platform.startswith('linux'):
+        thread_id = threading.get_native_id()
+        try:
+            import psutil
+            # I/O priorities are per thread on Linux, psutil accepts a thread id as the pid
+            psutil.Process(thread_id).ionice(psutil.IOPRIO_CLASS_IDLE)
+            return
+        except Exception:
+            pass
+        # Without psutil the niceness of the thread is the closest thing, the kernel derives the I/O priority from it
+        try:
+            os.setpriority(os.PRIO_PROCESS, thread_id, 10)
+        except OSError:
+            pass
+    elif sys.platform == 'win32':
+        import ctypes
+        THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+        kernel32 = ctypes.windll.kernel32
+        kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_MODE_BACKGROUND_BEGIN)
+    elif sys.platform == 'darwin':
+        import ctypes
+        IOPOL_TYPE_DISK, IOPOL_SCOPE_THREAD, IOPOL_THROTTLE = 0, 1, 3
+        try:
+            ctypes.CDLL(None).setiopolicy_np(IOPOL_TYPE_DISK, IOPOL_SCOPE_THREAD, IOPOL_THROTTLE)
+        except (OSError, AttributeError):
+            pass
+
+class JobStopped(BaseException):
+    # Not an Exception subclass so the per-file error handlers in the move loops let it through
+    pass
+
+class IOGovernor:
+    MAX_BACKOFF = 0.5
+    # Latency floors below which jitter is ignored, per rename and per copied byte
+    LATENCY_FLOOR = {'rename': 0.001, 'copy': 1e-9}
+    # Longest uninterrupted sleep, so a stop request is noticed quickly
+    SLEEP_SLICE = 0.1
+
+    def __init__(self, max_ops=0, max_bytes=0, low_priority=False, window_start=None, window_end=None):
+        self.ops_bucket = TokenBucket(max_ops)
+        self.bytes_bucket = TokenBucket(max_bytes)
+        self.low_priority = low_priority
+        self.window_start = self.parse_time(window_start)
+        self.window_end = self.parse_time(window_end)
+        if self.window_start == self.window_end:
+            self.window_start = self.window_end = None
+        self.latency = {}
+        self.backoff = 0.0
+        self.stopped = False
+
+    @staticmethod
+    def parse_time(value):
+        if not value:
+            return None
+        hours, minutes = str(value).split(':')
+        hours, minutes = int(hours), int(minutes)
+        if not (0 <= hours < 24 and 0 <= minutes < 60):
+            raise ValueError(f"Invalid time of day: {value}")
+        return hours * 60 + minutes
+
+    def stop(self):
+        self.stopped = True
+
+    def sleep(self, seconds):
+        deadline = time.monotonic() + seconds
+        while True:
+            if self.stopped:
+                raise JobStopped()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, self.SLEEP_SLICE))
+
+    def wait_for_window(self):
+        while not self.in_window():
+            self.sleep(min(self.seconds_until_window(), 1.0))
+
+    def throttle(self):
+        if self.stopped:
+            raise JobStopped()
+        self.wait_for_window()
+        self.sleep(self.ops_bucket.consume(1) + self.backoff)
+
+    def transfer(self, num_bytes):
+        # Charged per chunk while copying, so the data moves at the capped rate instead of in bursts
+        self.sleep(self.bytes_bucket.consume(num_bytes))
+
+    def record_latency(self, seconds, num_bytes=0):
+        # Renames and copies are tracked apart, copies per byte, so one large copy does not look like a slow disk
+        kind = 'copy' if num_bytes else 'rename'
+        value = seconds / num_bytes if num_bytes else seconds
+        if kind not in self.latency:
+            self.latency[kind] = [value, value]
+            return
+        stats = self.latency[kind]
+        stats[0] = 0.8 * stats[0] + 0.2 * value
+        # The baseline follows the fastest moves we have seen, drifting up slowly so it can recover
+        stats[1] = min(stats[0], stats[1] * 1.01)
+        if stats[0] > 2 * max(stats[1], self.LATENCY_FLOOR[kind]):
+            self.backoff = min(max(self.backoff * 2, 0.005), self.MAX_BACKOFF)
+        elif self.backoff:
+            self.backoff = self.backoff / 2 if self.backoff > 0.001 else 0.0
+
+    def in_window(self, now=None):
+        if self.window_start is None or self.window_end is None:
+            return True
+        now = now or datetime.now()
+        minute = now.hour * 60 + now.minute
+        if self.window_start <= self.window_end:
+            return self.window_start <= minute < self.window_end
+        return minute >= self.window_start or minute < self.window_end
+
+    def seconds_until_window(self, now=None):
+        now = now or datetime.now()
+        if self.in_window(now):
+            return 0
+        start = now.replace(hour=self.window_start // 60, minute=self.window_start % 60, second=0, microsecond=0)
+        if start <= now:
+            start += timedelta(days=1)
+        return (start - now).total_seconds()
+
+# ioctl request number of FICLONE on Linux, shares the extents of a file on CoW filesystems (Btrfs, XFS)
+FICLONE = 0x40049409
+
+def link_file(source_path, dest_path):
+    try:
+        os.link(source_path, dest_path)
+        return 'hardlink'
+    except FileExistsError:
+        raise
+    except OSError:
+        pass
+
+    try:
+        import fcntl
+        with open(source_path, 'rb') as src:
+            # 'xb' so a name that appeared in the meantime, possibly a hard link to the source, is never truncated
+            with open(dest_path, 'xb') as dst:
+                try:
+                    fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                except OSError:
+                    dst.close()
+                    os.remove(dest_path)
+                    raise
+        shutil.copystat(source_path, dest_path)
+        return 'reflink'
+    except FileExistsError:
+        raise
+    except (ImportError, OSError):
+        pass
+
+    os.symlink(source_path, dest_path)
+    return 'symlink'
+
+MIRROR_MANIFEST = '.fileorganizer_mirror.json'
+
+def load_mirror_manifest(output_root):
+    manifest_path = os.path.join(output_root, MIRROR_MANIFEST)
+    if not os.path.exists(manifest_path):
+        return {'source_dir': None, 'folders': [], 'entries': {}}
+    with open(manifest_path, 'r') as f:
+        try:
+            return json.load(f)
+        except json.JSONDecodeError:
+            raise ValueError(f"The mirror manifest {manifest_path} is damaged.")
+
+def save_mirror_manifest(output_root, manifest):
+    manifest_path = os.path.join(output_root, MIRROR_MANIFEST)
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+def is_link_current(source_path, source_stat, dest_path):
+    try:
+        dest_stat = os.lstat(dest_path)
+    except FileNotFoundError:
+        return False
+    if os.path.islink(dest_path):
+        return os.readlink(dest_path) == source_path
+    if (dest_stat.st_dev, dest_stat.st_ino) == (source_stat.st_dev, source_stat.st_ino):
+        return True
+    # Reflinks are separate inodes, copystat keeps the mtime so size and mtime identify an unchanged clone
+    return dest_stat.st_size == source_stat.st_size and dest_stat.st_mtime_ns == source_stat.st_mtime_ns
+
+def format_size(num_bytes):
+    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+        if num_bytes < 1024 or unit == 'TB':
+            return f"{num_bytes:.1f} {unit}" if unit != 'B' else f"{num_bytes} B"
+        num_bytes /= 1024
+
+class DiskAnalyzer:
+    BATCH_SIZE = 256
+
+    def __init__(self, root, extension_to_folder, unknown_name, top_n=20, workers=8, progress_interval=0.25):
+        self.root = root
+        self.extension_to_folder = extension_to_folder
+        self.unknown_name = unknown_name
+        self.top_n = top_n
+        self.workers = workers
+        self.progress_interval = progress_interval
+        self.cancelled = False
+
+        self.file_count = 0
+        self.dir_count = 0
+        self.total_bytes = 0
+        self.categories = {}
+        self.largest = []
+        self.unknown_extensions = Counter()
+        self.unknown_bytes = Counter()
+        self.errors = 0
+
+    @staticmethod
+    def scan_dir(path):
+        files = []
+        subdirs = []
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        files.append((entry.path, entry.name, entry.stat(follow_symlinks=False).st_size))
+                except OSError:
+                    pass
+        return files, subdirs
+
+    def add_files(self, files):
+        for path, name, size in files:
+            _, ext = os.path.splitext(name)
+            ext = ext.lower()
+            category = self.extension_to_folder.get(ext)
+            if not category:
+                category = self.unknown_name
+                self.unknown_extensions[ext or '(none)'] += 1
+                self.unknown_bytes[ext or '(none)'] += size
+            stats = self.categories.setdefault(category, [0, 0])
+            stats[0] += 1
+            stats[1] += size
+
+            if len(self.largest) < self.top_n:
+                heapq.heappush(self.largest, (size, path))
+            elif size > self.largest[0][0]:
+                heapq.heapreplace(self.largest, (size, path))
+
+            self.file_count += 1
+            self.total_bytes += size
+
+    def snapshot(self, done=False):
+        return {
+            'done': done,
+            'files': self.file_count,
+            'dirs': self.dir_count,
+            'bytes': self.total_bytes,
+            'errors': self.errors,
+            'categories': sorted(((name, stats[0], stats[1]) for name, stats in self.categories.items()), key=lambda item: -item[2]),
+            'largest': sorted(self.largest, reverse=True),
+            'unknown': [(ext, count, self.unknown_bytes[ext]) for ext, count in self.unknown_extensions.most_common(self.top_n)],
+        }
+
+    def scan_worker(self, tasks, results):
+        while True:
+            path = tasks.get()
+            if path is None:
+                return
+            # Each worker walks its subtree depth-first on its own and reports in batches,
+            # a queue round trip per directory costs more than the scandir itself
+            stack = [path]
+            files = []
+            dir_count = 0
+            errors = 0
+            while stack and not self.cancelled:
+                try:
+                    dir_files, subdirs = self.scan_dir(stack.pop())
+                except OSError:
+                    errors += 1
+                    continue
+                dir_count += 1
+                files.extend(dir_files)
+                stack.extend(subdirs)
+
+                # Hand work to idle workers only when the shared queue runs dry
+                idle = self.workers - tasks.qsize()
+                if len(stack) > 1 and idle > 0:
+                    shared = stack[:min(idle, len(stack) - 1)]
+                    del stack[:len(shared)]
+                    # Announced before queueing so the main loop never sees the count drop to zero early
+                    results.put(([], 0, 0, len(shared), False))
+                    for subdir in shared:
+                        tasks.put(subdir)
+
+                if dir_count >= self.BATCH_SIZE or len(files) >= self.BATCH_SIZE:
+                    results.put((files, dir_count, errors, 0, False))
+                    files, dir_count, errors = [], 0, 0
+            results.put((files, dir_count, errors, 0, True))
+
+    def run(self, on_progress=None):
+        tasks = queue.Queue()
+        results = queue.Queue()
+        workers = [threading.Thread(target=self.scan_worker, args=(tasks, results), daemon=True)
+                   for _ in range(self.workers)]
+        for worker in workers:
+            worker.start()
+
+        tasks.put(self.root)
+        outstanding = 1
+        last_progress = time.monotonic()
+        while outstanding:
+            try:
+                files, dir_count, errors, shared, finished = results.get(timeout=self.progress_interval)
+                self.dir_count += dir_count
+                self.errors += errors
+                self.add_files(files)
+                outstanding += shared - finished
+            except queue.Empty:
+                pass
+
+            now = time.monotonic()
+            if on_progress and now - last_progress >= self.progress_interval:
+                last_progress = now
+                on_progress(self.snapshot())
+
+        for _ in workers:
+            tasks.put(None)
+
+        result = self.snapshot(done=True)
+        if on_progress:
+            on_progress(result)
+        return result
+
+class MoveEngine:
+    COPY_CHUNK = 1024 * 1024
+
+    def __init__(self, governor=None, verify=False):
+        self.governor = governor or IOGovernor()
+        self.verify = verify
+        self.report = []
+        self.dir_fds = {}
+        # Windows has no dir_fd support for rename, there every move goes through shutil
+        self.use_dir_fd = os.rename in os.supports_dir_fd and hasattr(os, 'O_DIRECTORY')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open_dir(self, path):
+        if path not in self.dir_fds:
+            try:
+                fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+                self.dir_fds[path] = (fd, os.fstat(fd).st_dev)
+            except OSError:
+                # A folder we may write to but not list cannot be opened, the path based move still works there
+                self.dir_fds[path] = None
+        return self.dir_fds[path]
+
+    def release_dir(self, path):
+        opened = self.dir_fds.pop(path, None)
+        if opened:
+            os.close(opened[0])
+
+    def close(self):
+        for opened in self.dir_fds.values():
+            if opened:
+                os.close(opened[0])
+        self.dir_fds.clear()
+
+    @staticmethod
+    def rename_no_replace(source_fd, name, dest_fd, dest_name):
+        # os.rename silently replaces an existing file or empty folder, linking fails on an existing name instead
+        try:
+            os.link(name, dest_name, src_dir_fd=source_fd, dst_dir_fd=dest_fd, follow_symlinks=False)
+        except FileExistsError:
+            raise
+        except OSError:
+            # Folders cannot be hard linked and some filesystems (FAT, exFAT) have no hard links at all,
+            # those fall back to a check before the rename
+            try:
+                os.lstat(dest_name, dir_fd=dest_fd)
+            except FileNotFoundError:
+                os.rename(name, dest_name, src_dir_fd=source_fd, dst_dir_fd=dest_fd)
+                return
+            raise FileExistsError(errno.EEXIST, "Destination already exists", dest_name)
+
+        try:
+            os.unlink(name, dir_fd=source_fd)
+        except OSError:
+            os.unlink(dest_name, dir_fd=dest_fd)
+            raise
+
+    def move(self, source_dir, name, dest_dir, dest_name=None):
+        dest_name = dest_name or name
+        num_bytes = 0
+        source = self.open_dir(source_dir) if self.use_dir_fd else None
+        dest = self.open_dir(dest_dir) if self.use_dir_fd else None
+        if source and dest:
+            source_fd, source_dev = source
+            dest_fd, dest_dev = dest
+            if source_dev == dest_dev:
+                self.governor.throttle()
+                start = time.monotonic()
+                try:
+                    self.rename_no_replace(source_fd, name, dest_fd, dest_name)
+                    self.governor.record_latency(time.monotonic() - start)
+                    return
+                except OSError as e:
+                    # Bind mounts and overlayfs report the same st_dev but still refuse the rename,
+                    # those are moved like any other cross-device entry
+                    if e.errno != errno.EXDEV:
+                        raise
+            num_bytes = os.stat(name, dir_fd=source_fd, follow_symlinks=False).st_size
+            cross_device = True
+        else:
+            # Renames on the same device move no data, only cross-device copies count against the byte budget
+            source_stat = os.lstat(os.path.join(source_dir, name))
+            cross_device = source_stat.st_dev != os.stat(dest_dir).st_dev
+            if cross_device:
+                num_bytes = source_stat.st_size
+
+        dest_path = os.path.join(dest_dir, dest_name)
+        # shutil.move would replace an existing file and move into an existing folder
+        if os.path.lexists(dest_path):
+            raise FileExistsError(errno.EEXIST, "Destination already exists", dest_path)
+
+        self.governor.throttle()
+        start = time.monotonic()
+        if cross_device:
+            self.copy_move(os.path.join(source_dir, name), dest_path)
+        else:
+            shutil.move(os.path.join(source_dir, name), dest_path)
+        self.governor.record_latency(time.monotonic() - start, max(num_bytes, 1) if cross_device else 0)
+
+    def hash_file(self, path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            # Ask the kernel to drop the cached pages so the read-back comes from the disk. Without
+            # posix_fadvise (macOS, Windows) it may be served from the cache, the report records which one it was
+            uncached = hasattr(os, 'posix_fadvise')
+            if uncached:
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+            while chunk := f.read(self.COPY_CHUNK):
+                digest.update(chunk)
+        return digest.hexdigest(), uncached
+
+    def copy_chunks(self, src, dst, digest=None):
+        while chunk := src.read(self.COPY_CHUNK):
+            self.governor.transfer(len(chunk))
+            if digest:
+                digest.update(chunk)
+            dst.write(chunk)
+
+    def copy_throttled(self, source_path, dest_path):
+        # 'xb' never truncates an existing file, so whatever is at dest_path on failure is our partial copy
+        with open(source_path, 'rb') as src, open(dest_path, 'xb') as dst:
+            try:
+                self.copy_chunks(src, dst)
+            except BaseException:
+                dst.close()
+                os.remove(dest_path)
+                raise
+        shutil.copystat(source_path, dest_path)
+        return dest_path
+
+    def copy_hashed(self, source_path, dest_path):
+        digest = hashlib.sha256()
+        with open(source_path, 'rb') as src, open(dest_path, 'xb') as dst:
+            try:
+                self.copy_chunks(src, dst, digest)
+                dst.flush()
+                # Metadata first, so the fsync also makes the timestamps and mode durable
+                shutil.copystat(source_path, dest_path)
+                os.fsync(dst.fileno())
+            except BaseException:
+                dst.close()
+                os.remove(dest_path)
+                raise
+
+        try:
+            source_hash = digest.hexdigest()
+            dest_hash, uncached = self.hash_file(dest_path)
+            if dest_hash != source_hash:
+                raise OSError(f"Checksum mismatch after copying {source_path} to {dest_path}")
+        except BaseException:
+            os.remove(dest_path)
+            raise
+
+        self.report.append({'source': source_path, 'destination': dest_path, 'sha256': source_hash,
+                            'read_back_uncached': uncached})
+        return dest_path
+
+    @staticmethod
+    def fsync_dir(path):
+        # Windows cannot open a folder as a file, NTFS journals the directory entries itself
+        if os.name == 'nt':
+            return
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def copy_move(self, source_path, dest_path):
+        # Copies go through the byte budget chunk by chunk, verified copies are also hashed in the same pass
+        copy_function = self.copy_hashed if self.verify else self.copy_throttled
+        if os.path.islink(source_path):
+            shutil.move(source_path, dest_path)
+        elif os.path.isdir(source_path):
+            if os.path.lexists(dest_path):
+                raise FileExistsError(errno.EEXIST, "Destination already exists", dest_path)
+            reported = len(self.report)
+            try:
+                shutil.copytree(source_path, dest_path, symlinks=True, copy_function=copy_function)
+            except BaseException:
+                # Leave nothing half copied behind, a retry would otherwise fail on the existing folder
+                shutil.rmtree(dest_path, ignore_errors=True)
+                del self.report[reported:]
+                raise
+            if self.verify:
+                # The new directory entries must survive a power loss before the source is gone
+                for dir_path, _, _ in os.walk(dest_path):
+                    self.fsync_dir(dir_path)
+                self.fsync_dir(os.path.dirname(dest_path))
+            shutil.rmtree(source_path)
+        else:
+            copy_function(source_path, dest_path)
+            if self.verify:
+                self.fsync_dir(os.path.dirname(dest_path))
+            os.remove(source_path)
+
+class BKTree:
+    def __init__(self):
+        self.root = None
+
+    def add(self, value, item):
+        if self.root is None:
+            self.root = (value, item, {})
+            return
+        node = self.root
+        while True:
+            distance = bin(node[0] ^ value).count('1')
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (value, item, {})
+                return
+            node = child
+
+    def search(self, value, radius):
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node_value, item, children = stack.pop()
+            distance = bin(node_value ^ value).count('1')
+            if distance <= radius:
+                found.append(item)
+            for child_distance, child in children.items():
+                if distance - radius <= child_distance <= distance + radius:
+                    stack.append(child)
+        return found
+
+class ImageGrouper:
+    HASH_WIDTH = 9
+    HASH_HEIGHT = 8
+    # Above this many distinct hashes multi-index hashing beats comparing every pair, even in NumPy blocks
+    MULTI_INDEX_THRESHOLD = 2000
+    # Upper bound on the hash pairs held in memory at once by the blocked comparison
+    COMPARE_PAIRS = 4000000
+    POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8) if np is not None else None
+    # The cache is shared by every sorted folder, the least recently used hashes are dropped past this size
+    CACHE_LIMIT = 50000
+
+    def __init__(self, threshold=6, cache_path=None, batch_size=256, workers=4):
+        self.threshold = threshold
+        self.cache_path = cache_path
+        self.batch_size = batch_size
+        self.workers = workers
+        self.cache = {}
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r') as f:
+                    self.cache = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Ignoring image hash cache {cache_path}: {e}")
+
+    def save_cache(self):
+        if not self.cache_path:
+            return
+        # Entries are kept in least to most recently used order, so the oldest are at the front
+        for key in list(self.cache)[:max(len(self.cache) - self.CACHE_LIMIT, 0)]:
+            del self.cache[key]
+        with open(self.cache_path + '.tmp', 'w') as f:
+            json.dump(self.cache, f)
+        os.replace(self.cache_path + '.tmp', self.cache_path)
+
+    @staticmethod
+    def cache_key(stat):
+        return f"{stat.st_dev}:{stat.st_ino}:{stat.st_mtime_ns}"
+
+    def load_thumbnail(self, path):
+        reader = QImageReader(path)
+        reader.setAutoTransform(True)
+        # Lets JPEG decode straight to a reduced size instead of decoding the full image first. The EXIF
+        # rotation is applied after scaling, so portrait orientations ask for the transposed size
+        if reader.transformation() & QImageIOHandler.Transformation.TransformationRotate90:
+            reader.setScaledSize(QSize(self.HASH_HEIGHT, self.HASH_WIDTH))
+        else:
+            reader.setScaledSize(QSize(self.HASH_WIDTH, self.HASH_HEIGHT))
+        image = reader.read()
+        if image.isNull():
+            return None
+        if image.width() != self.HASH_WIDTH or image.height() != self.HASH_HEIGHT:
+            image = image.scaled(self.HASH_WIDTH, self.HASH_HEIGHT, Qt.AspectRatioMode.IgnoreAspectRatio,
+                                 Qt.TransformationMode.SmoothTransformation)
+        image = image.convertToFormat(QImage.Format.Format_Grayscale8)
+        raw = image.constBits().asstring(image.sizeInBytes())
+        stride = image.bytesPerLine()
+        return b''.join(raw[row * stride:row * stride + self.HASH_WIDTH] for row in range(self.HASH_HEIGHT))
+
+    def dhash_batch(self, thumbnails):
+        if np is not None:
+            pixels = np.frombuffer(b''.join(thumbnails), dtype=np.uint8).reshape(-1, self.HASH_HEIGHT, self.HASH_WIDTH)
+            bits = (pixels[:, :, 1:] > pixels[:, :, :-1]).reshape(len(thumbnails), -1)
+            return [int(value) for value in np.packbits(bits, axis=1).view('>u8').ravel()]
+
+        hashes = []
+        for thumbnail in thumbnails:
+            value = 0
+            for row in range(self.HASH_HEIGHT):
+                offset = row * self.HASH_WIDTH
+                for col in range(self.HASH_WIDTH - 1):
+                    value = (value << 1) | (thumbnail[offset + col + 1] > thumbnail[offset + col])
+            hashes.append(value)
+        return hashes
+
+    def compute_hashes(self, paths):
+        hashes = {}
+        missing = []
+        for path in paths:
+            try:
+                key = self.cache_key(os.stat(path))
+            except OSError:
+                continue
+            if key in self.cache:
+                self.cache[key] = self.cache.pop(key)
+                hashes[path] = int(self.cache[key], 16)
+            else:
+                missing.append((path, key))
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for start in range(0, len(missing), self.batch_size):
+                batch = missing[start:start + self.batch_size]
+                thumbnails = list(executor.map(self.load_thumbnail, [path for path, _ in batch]))
+                decoded = [(item, thumbnail) for item, thumbnail in zip(batch, thumbnails) if thumbnail]
+                if not decoded:
+                    continue
+                batch_hashes = self.dhash_batch([thumbnail for _, thumbnail in decoded])
+                for ((path, key), _), value in zip(decoded, batch_hashes):
+                    hashes[path] = value
+                    self.cache[key] = f"{value:016x}"
+        return hashes
+
+    def hamming(self, a, b):
+        diff = a ^ b
+        if hasattr(np, 'bitwise_count'):
+            return np.bitwise_count(diff)
+        return self.POPCOUNT[diff.view(np.uint8)].reshape(diff.shape + (8,)).sum(axis=-1)
+
+    def pairs_blocked(self, values):
+        block = max(1, self.COMPARE_PAIRS // max(len(values), 1))
+        for start in range(0, len(values), block):
+            distances = self.hamming(values[start:start + block, None], values[None, start:])
+            rows, cols = np.nonzero(distances <= self.threshold)
+            rows += start
+            cols += start
+            keep = rows < cols
+            yield rows[keep], cols[keep]
+
+    def pairs_multi_index(self, values):
+        # Two hashes at most `threshold` bits apart agree exactly on at least one of threshold + 1 blocks,
+        # so only hashes sharing a block value need their full distance checked
+        bounds = np.linspace(0, 64, self.threshold + 2).astype(int)
+        for low, high in zip(bounds[:-1], bounds[1:]):
+            keys = (values >> np.uint64(low)) & np.uint64((1 << int(high - low)) - 1)
+            order = np.argsort(keys, kind='stable')
+            sorted_keys = keys[order]
+            # Equal keys are adjacent once sorted, pairing every entry with the one `offset` places on
+            # covers each bucket; there are no more pairs once no offset-apart keys match
+            for offset in range(1, len(values)):
+                same = sorted_keys[offset:] == sorted_keys[:-offset]
+                if not same.any():
+                    break
+                rows = order[:-offset][same]
+                cols = order[offset:][same]
+                close = self.hamming(values[rows], values[cols]) <= self.threshold
+                yield rows[close], cols[close]
+
+    def group(self, hashes):
+        paths = list(hashes)
+        parent = list(range(len(paths)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def union(i, j):
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        if np is None:
+            tree = BKTree()
+            for i, path in enumerate(paths):
+                for j in tree.search(hashes[path], self.threshold):
+                    union(i, j)
+                tree.add(hashes[path], i)
+            labels = [find(i) for i in range(len(paths))]
+        else:
+            values = np.array([hashes[path] for path in paths], dtype=np.uint64)
+            # Burst shots often hash identically, exact duplicates are collapsed so they cost a single comparison
+            values, inverse = np.unique(values, return_inverse=True)
+            parent[:] = range(len(values))
+            if len(values) > self.MULTI_INDEX_THRESHOLD and self.threshold < 64:
+                pairs = self.pairs_multi_index(values)
+            else:
+                pairs = self.pairs_blocked(values)
+            for rows, cols in pairs:
+                for i, j in zip(rows.tolist(), cols.tolist()):
+                    union(i, j)
+            labels = [find(i) for i in inverse.ravel().tolist()]
+
+        groups = {}
+        for label, path in zip(labels, paths):
+            groups.setdefault(label, []).append(path)
+        return [sorted(members) for members in groups.values() if len(members) > 1]
+
+class JobWorker(QThread):
+    job_finished = pyqtSignal(str, str)
+
+    def __init__(self, job, governor):
+        super().__init__()
+        self.job = job
+        self.governor = governor
+
+    def run(self):
+        if self.governor.low_priority:
+            lower_thread_priority()
+        try:
+            self.job_finished.emit("Done", self.job(self.governor))
+        except JobStopped:
+            self.job_finished.emit("Stopped", "The job was stopped before it finished.")
+        except Exception as e:
+            self.job_finished.emit("Error", str(e))
+
+    def stop(self):
+        self.governor.stop()
+
+class AnalyzeWorker(QThread):
+    progress = pyqtSignal(dict)
+
+    def __init__(self, analyzer):
+        super().__init__()
+        self.analyzer = analyzer
+
+    def run(self):
+        self.analyzer.run(self.progress.emit)
+
+    def stop(self):
+        self.analyzer.cancelled = True
+
 STYLE_SHEET = """
 /* --- Global Styles --- */
 QWidget {
@@ -251,6 +1055,53 @@ class AboutWindow(QDialog):
         copyright_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(copyright_label)
 
+class AnalyzeWindow(QDialog):
+    def __init__(self, analyzer, lang_texts):
+        super().__init__()
+        self.lang_texts = lang_texts
+        self.setWindowTitle(lang_texts['analyze_title'])
+        self.setFixedSize(500, 400)
+
+        layout = QVBoxLayout(self)
+
+        self.report_text = QTextEdit()
+        self.report_text.setReadOnly(True)
+        layout.addWidget(self.report_text)
+
+        self.btn_close = QPushButton(lang_texts['close_btn'])
+        self.btn_close.clicked.connect(self.accept)
+        layout.addWidget(self.btn_close)
+
+        self.worker = AnalyzeWorker(analyzer)
+        self.worker.progress.connect(self.show_progress)
+        self.worker.start()
+
+    def show_progress(self, result):
+        texts = self.lang_texts
+        status = texts['analyze_done'] if result['done'] else texts['analyze_running']
+        lines = [
+            f"{status} {result['files']} / {result['dirs']} - {format_size(result['bytes'])}",
+            "",
+            texts['analyze_categories'],
+        ]
+        for name, count, size in result['categories']:
+            lines.append(f"  {name}: {count} - {format_size(size)}")
+        lines += ["", texts['analyze_largest']]
+        for size, path in result['largest']:
+            lines.append(f"  {format_size(size)}  {path}")
+        if result['unknown']:
+            lines += ["", texts['analyze_unknown']]
+            for ext, count, size in result['unknown']:
+                lines.append(f"  {ext}: {count} - {format_size(size)}")
+        if result['errors']:
+            lines += ["", f"{texts['analyze_errors']} {result['errors']}"]
+        self.report_text.setPlainText("\n".join(lines))
+
+    def done(self, result):
+        self.worker.stop()
+        self.worker.wait()
+        super().done(result)
+
 class FileSorter(QWidget):
     
     FILE_CATEGORIES = {
@@ -369,11 +1220,32 @@ class FileSorter(QWidget):
                 'confirm_revert': "Are you sure you want to revert folder changes in this directory?",
                 'chk_unknown': "Create UNKNOWN folder",
                 'chk_folders': "Create FOLDERS folder",
+                'chk_throttle': "Throttle disk I/O",
+                'chk_offpeak': "Run large jobs off-peak only",
+                'chk_verify': "Verify cross-device moves with checksums",
+                'chk_similar': "Group similar images",
+                'similar_group': "Similar {n}",
+                'scheduled_title': "Scheduled",
+                'scheduled_msg': "This is a large job, it will start in the off-peak window at {start}.",
+                'job_busy': "Another job is already running or scheduled.",
                 'menu_language': "Language",
                 'menu_settings': "Settings",
                 'menu_about': "About",
                 'menu_eula': "End User License Agreement (EULA)",
                 'menu_about_app': "About FileOrganizer",
+                'menu_tools': "Tools",
+                'menu_mirror': "Mirror organize to folder...",
+                'mirror_same_dir': "The output folder must be different from the source folder.",
+                'mirror_foreign_dir': "The output folder already has a \"{name}\" folder that was not created by the mirror.",
+                'menu_analyze': "Analyze disk usage...",
+                'analyze_title': "Disk usage",
+                'analyze_running': "Scanning... files / folders:",
+                'analyze_done': "Finished. Files / folders:",
+                'analyze_categories': "Size by category:",
+                'analyze_largest': "Largest files:",
+                'analyze_unknown': "Unknown extensions:",
+                'analyze_errors': "Unreadable folders:",
+                'close_btn': "Close",
                 'folder_names': {
                     "IMAGES": "Images",
                     "DOCUMENTS": "Documents",
@@ -401,11 +1273,32 @@ class FileSorter(QWidget):
                 'confirm_revert': "Biztosan vissza szeretnéd vonni a mappaműveleteket?",
                 'chk_unknown': "ISMERETLEN mappa létrehozása",
                 'chk_folders': "MAPPÁK mappa létrehozása",
+                'chk_throttle': "Lemezhasználat korlátozása",
+                'chk_offpeak': "Nagy feladatok futtatása csúcsidőn kívül",
+                'chk_verify': "Eszközök közötti áthelyezések ellenőrzése",
+                'chk_similar': "Hasonló képek csoportosítása",
+                'similar_group': "Hasonló {n}",
+                'scheduled_title': "Ütemezve",
+                'scheduled_msg': "Ez egy nagy feladat, a csúcsidőn kívüli időablakban indul: {start}.",
+                'job_busy': "Egy másik feladat már fut vagy ütemezve van.",
                 'menu_language': "Nyelv",
                 'menu_settings': "Beállítások",
                 'menu_about': "Névjegy",
                 'menu_eula': "Általános Szerződési Feltételek (ÁSZF)",
                 'menu_about_app': "A FileOrganizer-ről",
+                'menu_tools': "Eszközök",
+                'menu_mirror': "Rendezett tükör készítése mappába...",
+                'mirror_same_dir': "A célmappának különböznie kell a forrásmappától.",
+                'mirror_foreign_dir': "A célmappában már van egy \"{name}\" mappa, amelyet nem a tükrözés hozott létre.",
+                'menu_analyze': "Lemezhasználat elemzése...",
+                'analyze_title': "Lemezhasználat",
+                'analyze_running': "Keresés... fájlok / mappák:",
+                'analyze_done': "Kész. Fájlok / mappák:",
+                'analyze_categories': "Méret kategóriánként:",
+                'analyze_largest': "Legnagyobb fájlok:",
+                'analyze_unknown': "Ismeretlen kiterjesztések:",
+                'analyze_errors': "Olvashatatlan mappák:",
+                'close_btn': "Bezárás",
                 'folder_names': {
                     "IMAGES": "Képek",
                     "DOCUMENTS": "Dokumentumok",
@@ -428,6 +1321,20 @@ class FileSorter(QWidget):
         self.current_language = 'hu'
         self.create_unknown = False
         self.create_folders = False
+        self.io_throttle = False
+        self.io_max_ops = 200
+        self.io_max_bytes = 50 * 1024 * 1024
+        self.io_low_priority = True
+        self.offpeak_only = False
+        self.offpeak_start = "22:00"
+        self.offpeak_end = "06:00"
+        self.offpeak_min_files = 1000
+        self.verify_moves = False
+        self.group_similar_images = False
+        self.similar_threshold = 6
+        self.job_worker = None
+        self.scheduled_timer = QTimer(self)
+        self.scheduled_timer.setSingleShot(True)
         self.load_settings()
 
         self.setWindowTitle("FileOrganizer")
@@ -539,6 +1446,42 @@ class FileSorter(QWidget):
         self.act_folders.triggered.connect(self.toggle_folders)
         self.settings_menu.addAction(self.act_folders)
 
+        self.settings_menu.addSeparator()
+
+        self.act_throttle = QAction("Throttle disk I/O", self)
+        self.act_throttle.setCheckable(True)
+        self.act_throttle.setChecked(self.io_throttle)
+        self.act_throttle.triggered.connect(self.toggle_throttle)
+        self.settings_menu.addAction(self.act_throttle)
+
+        self.act_offpeak = QAction("Run large jobs off-peak only", self)
+        self.act_offpeak.setCheckable(True)
+        self.act_offpeak.setChecked(self.offpeak_only)
+        self.act_offpeak.triggered.connect(self.toggle_offpeak)
+        self.settings_menu.addAction(self.act_offpeak)
+
+        self.act_verify = QAction("Verify cross-device moves with checksums", self)
+        self.act_verify.setCheckable(True)
+        self.act_verify.setChecked(self.verify_moves)
+        self.act_verify.triggered.connect(self.toggle_verify)
+        self.settings_menu.addAction(self.act_verify)
+
+        self.act_similar = QAction("Group similar images", self)
+        self.act_similar.setCheckable(True)
+        self.act_similar.setChecked(self.group_similar_images)
+        self.act_similar.triggered.connect(self.toggle_similar)
+        self.settings_menu.addAction(self.act_similar)
+
+        self.tools_menu = menu_bar.addMenu("Tools")
+
+        self.mirror_action = QAction("Mirror organize to folder...", self)
+        self.mirror_action.triggered.connect(self.mirror_files)
+        self.tools_menu.addAction(self.mirror_action)
+
+        self.analyze_action = QAction("Analyze disk usage...", self)
+        self.analyze_action.triggered.connect(self.analyze_files)
+        self.tools_menu.addAction(self.analyze_action)
+
         self.about_menu = menu_bar.addMenu("About")
         
         self.eula_action = QAction("End User License Agreement (EULA)", self)
@@ -583,12 +1526,19 @@ class FileSorter(QWidget):
         # Update Menu Items
         self.lang_menu.setTitle(lang_texts['menu_language'])
         self.settings_menu.setTitle(lang_texts['menu_settings'])
+        self.tools_menu.setTitle(lang_texts['menu_tools'])
         self.about_menu.setTitle(lang_texts['menu_about'])
         
         self.act_unknown.setText(lang_texts['chk_unknown'])
         self.act_folders.setText(lang_texts['chk_folders'])
+        self.act_throttle.setText(lang_texts['chk_throttle'])
+        self.act_offpeak.setText(lang_texts['chk_offpeak'])
+        self.act_verify.setText(lang_texts['chk_verify'])
+        self.act_similar.setText(lang_texts['chk_similar'])
         self.eula_action.setText(lang_texts['menu_eula'])
         self.about_action.setText(lang_texts['menu_about_app'])
+        self.mirror_action.setText(lang_texts['menu_mirror'])
+        self.analyze_action.setText(lang_texts['menu_analyze'])
 
     def select_folder(self):
         folder = QFileDialog.getExistingDirectory(None, "Válassz mappát", "", QFileDialog.Option.ShowDirsOnly)
@@ -610,70 +1560,210 @@ class FileSorter(QWidget):
         if reply == QMessageBox.StandardButton.No:
             return
 
+        self.run_when_allowed(source_dir, lambda governor: self.run_sort(source_dir, governor))
+
+    def run_sort(self, source_dir, governor):
         translated_folder_names = self.translations[self.current_language]['folder_names']
-        
-        extension_to_folder = {}
-        for category, extensions in self.FILE_CATEGORIES.items():
-            folder_name = translated_folder_names[category]
-            for ext in extensions:
-                extension_to_folder[ext] = folder_name
+        extension_to_folder = self.get_extension_map(translated_folder_names)
 
         try:
-            files_in_source_dir = [f for f in os.listdir(source_dir) if os.path.isfile(os.path.join(source_dir, f))]
+            with os.scandir(source_dir) as it:
+                files_in_source_dir = [entry.name for entry in it if entry.is_file()]
         except FileNotFoundError:
-             QMessageBox.warning(self, "Error", f"The directory {source_dir} was not found.")
-             return
+             raise FileNotFoundError(f"The directory {source_dir} was not found.")
 
         moved_count = 0
-        for filename in files_in_source_dir:
-            _, ext = os.path.splitext(filename)
-            dest_dir_name = extension_to_folder.get(ext.lower())
+        engine = MoveEngine(governor, self.verify_moves)
+        try:
+            with engine:
+                for filename in files_in_source_dir:
+                    _, ext = os.path.splitext(filename)
+                    dest_dir_name = extension_to_folder.get(ext.lower())
 
-            if not dest_dir_name and self.create_unknown:
-                dest_dir_name = translated_folder_names['UNKNOWN']
+                    if not dest_dir_name and self.create_unknown:
+                        dest_dir_name = translated_folder_names['UNKNOWN']
 
-            if dest_dir_name:
-                dest_dir = os.path.join(source_dir, dest_dir_name)
+                    if dest_dir_name:
+                        dest_dir = os.path.join(source_dir, dest_dir_name)
+                    
+                        if dest_dir not in engine.dir_fds and not os.path.exists(dest_dir):
+                            os.makedirs(dest_dir)
+                    
+                        try:
+                            engine.move(source_dir, filename, dest_dir)
+                            moved_count += 1
+                        except Exception as e:
+                            print(f"Error moving {filename}: {e}")
+            
+                if self.create_folders:
+                    folders_dest_name = translated_folder_names['FOLDERS']
+                    folders_dest_path = os.path.join(source_dir, folders_dest_name)
                 
-                if not os.path.exists(dest_dir):
-                    os.makedirs(dest_dir)
+                    if not os.path.exists(folders_dest_path):
+                        os.makedirs(folders_dest_path)
+
+                    with os.scandir(source_dir) as it:
+                        dirs_in_source = [entry.name for entry in it if entry.is_dir()]
+
+                    target_folders = set(translated_folder_names.values())
                 
-                source_path = os.path.join(source_dir, filename)
-                try:
-                    shutil.move(source_path, os.path.join(dest_dir, filename))
-                    moved_count += 1
-                except Exception as e:
-                    print(f"Error moving {filename}: {e}")
-        
-        if self.create_folders:
-            folders_dest_name = translated_folder_names['FOLDERS']
-            folders_dest_path = os.path.join(source_dir, folders_dest_name)
-            
-            if not os.path.exists(folders_dest_path):
-                os.makedirs(folders_dest_path)
+                    for dir_name in dirs_in_source:
+                        if dir_name not in target_folders:
+                            try:
+                                engine.move(source_dir, dir_name, folders_dest_path)
+                                moved_count += 1 # Counting folders as moved items too
+                            except Exception as e:
+                                print(f"Error moving folder {dir_name}: {e}")
+                
+                    if not os.listdir(folders_dest_path):
+                        engine.release_dir(folders_dest_path)
+                        try:
+                            os.rmdir(folders_dest_path)
+                        except:
+                            pass
 
-            dirs_in_source = [d for d in os.listdir(source_dir) if os.path.isdir(os.path.join(source_dir, d))]
+                images_dir = os.path.join(source_dir, translated_folder_names['IMAGES'])
+                if self.group_similar_images and os.path.isdir(images_dir):
+                    self.group_images(engine, images_dir)
+        finally:
+            self.save_report('sort', source_dir, engine.report)
+        return f"Sorting complete. Moved {moved_count} items."
 
-            target_folders = set(translated_folder_names.values())
-            
-            for dir_name in dirs_in_source:
-                if dir_name not in target_folders:
-                    source_path = os.path.join(source_dir, dir_name)
-                    dest_path = os.path.join(folders_dest_path, dir_name)
+
+    def mirror_files(self):
+        source_dir = self.path_input.text()
+        lang_texts = self.translations[self.current_language]
+
+        if not source_dir or not os.path.isdir(source_dir):
+            QMessageBox.warning(self, "Error", "Please select a valid directory first.")
+            return
+
+        output_root = QFileDialog.getExistingDirectory(None, lang_texts['menu_mirror'], "", QFileDialog.Option.ShowDirsOnly)
+        if not output_root:
+            return
+        if os.path.realpath(output_root) == os.path.realpath(source_dir):
+            QMessageBox.warning(self, "Error", lang_texts['mirror_same_dir'])
+            return
+
+        self.run_when_allowed(source_dir, lambda governor: self.run_mirror(source_dir, output_root, governor))
+
+    def run_mirror(self, source_dir, output_root, governor):
+        translated_folder_names = self.translations[self.current_language]['folder_names']
+        extension_to_folder = self.get_extension_map(translated_folder_names)
+        source_dir = os.path.abspath(source_dir)
+        output_real = os.path.realpath(output_root)
+
+        try:
+            entries = list(os.scandir(source_dir))
+        except FileNotFoundError:
+            raise FileNotFoundError(f"The directory {source_dir} was not found.")
+
+        planned = {}
+        for entry in entries:
+            if entry.is_file():
+                _, ext = os.path.splitext(entry.name)
+                dest_dir_name = extension_to_folder.get(ext.lower())
+                if not dest_dir_name and self.create_unknown:
+                    dest_dir_name = translated_folder_names['UNKNOWN']
+            elif entry.is_dir() and self.create_folders and os.path.realpath(entry.path) != output_real:
+                dest_dir_name = translated_folder_names['FOLDERS']
+            else:
+                dest_dir_name = None
+
+            if dest_dir_name:
+                planned.setdefault(dest_dir_name, []).append(entry)
+
+        manifest = load_mirror_manifest(output_root)
+        owned_folders = set(manifest['folders'])
+        owned_entries = manifest['entries']
+
+        # Category names are ordinary words, refuse to mix the mirror into folders the user already has
+        all_folder_names = set()
+        for lang_data in self.translations.values():
+            all_folder_names.update(lang_data['folder_names'].values())
+        for dir_name in sorted(all_folder_names):
+            if dir_name not in owned_folders and os.path.lexists(os.path.join(output_root, dir_name)):
+                raise FileExistsError(self.translations[self.current_language]['mirror_foreign_dir'].format(name=dir_name))
+
+        linked_count = 0
+        current_count = 0
+        removed_count = 0
+        planned_paths = set()
+        try:
+            for dest_dir_name, dir_entries in planned.items():
+                dest_dir = os.path.join(output_root, dest_dir_name)
+                if not os.path.exists(dest_dir):
+                    os.makedirs(dest_dir)
+                owned_folders.add(dest_dir_name)
+
+                for entry in dir_entries:
+                    rel_path = f"{dest_dir_name}/{entry.name}"
+                    dest_path = os.path.join(dest_dir, entry.name)
+                    planned_paths.add(rel_path)
                     try:
-                        shutil.move(source_path, dest_path)
-                        moved_count += 1 # Counting folders as moved items too
+                        if rel_path in owned_entries and is_link_current(entry.path, entry.stat(), dest_path):
+                            current_count += 1
+                            continue
+                        if rel_path not in owned_entries and os.path.lexists(dest_path):
+                            print(f"Skipping {dest_path}: it was not created by the mirror")
+                            continue
+                        governor.throttle()
+                        start = time.monotonic()
+                        if os.path.lexists(dest_path):
+                            os.remove(dest_path)
+                        owned_entries.pop(rel_path, None)
+                        if entry.is_dir():
+                            # Directories cannot be hard linked or cloned
+                            os.symlink(entry.path, dest_path)
+                        else:
+                            link_file(entry.path, dest_path)
+                        owned_entries[rel_path] = entry.path
+                        governor.record_latency(time.monotonic() - start)
+                        linked_count += 1
                     except Exception as e:
-                        print(f"Error moving folder {dir_name}: {e}")
-            
-            if not os.listdir(folders_dest_path):
+                        print(f"Error linking {entry.name}: {e}")
+
+            # Resync: drop what an earlier run created whose source was removed or now belongs to another category,
+            # including trees built in the other language
+            for rel_path in sorted(set(owned_entries) - planned_paths):
+                dest_path = os.path.join(output_root, *rel_path.split('/'))
                 try:
-                    os.rmdir(folders_dest_path)
-                except:
-                    pass
+                    if os.path.lexists(dest_path):
+                        os.remove(dest_path)
+                        removed_count += 1
+                    del owned_entries[rel_path]
+                except OSError as e:
+                    print(f"Error removing {dest_path}: {e}")
 
-        QMessageBox.information(self, "Done", f"Sorting complete. Moved {moved_count} items.")
+            for dir_name in sorted(owned_folders):
+                dest_dir = os.path.join(output_root, dir_name)
+                if not os.path.isdir(dest_dir):
+                    owned_folders.discard(dir_name)
+                elif not os.listdir(dest_dir):
+                    try:
+                        os.rmdir(dest_dir)
+                        owned_folders.discard(dir_name)
+                    except OSError:
+                        pass
+        finally:
+            manifest['source_dir'] = source_dir
+            manifest['folders'] = sorted(owned_folders)
+            save_mirror_manifest(output_root, manifest)
+
+        return f"Mirror complete. Linked {linked_count} items, {current_count} already up to date, removed {removed_count} stale links."
 
+    def analyze_files(self):
+        source_dir = self.path_input.text()
+        lang_texts = self.translations[self.current_language]
+
+        if not source_dir or not os.path.isdir(source_dir):
+            QMessageBox.warning(self, "Error", "Please select a valid directory first.")
+            return
+
+        translated_folder_names = lang_texts['folder_names']
+        analyzer = DiskAnalyzer(source_dir, self.get_extension_map(translated_folder_names), translated_folder_names['UNKNOWN'])
+        analyze_win = AnalyzeWindow(analyzer, lang_texts)
+        analyze_win.exec()
 
     def revert_files(self):
         source_dir = self.path_input.text()
@@ -691,30 +1781,177 @@ class FileSorter(QWidget):
         if reply == QMessageBox.StandardButton.No:
             return
 
+        self.run_when_allowed(source_dir, lambda governor: self.run_revert(source_dir, governor))
+
+    def run_revert(self, source_dir, governor):
         all_folder_names = set()
+        image_folder_names = set()
         for lang_data in self.translations.values():
             all_folder_names.update(lang_data['folder_names'].values())
+            image_folder_names.add(lang_data['folder_names']['IMAGES'])
 
         reverted_count = 0
-        for dir_name in all_folder_names:
-            sub_dir = os.path.join(source_dir, dir_name)
-            if os.path.isdir(sub_dir):
-                for filename in os.listdir(sub_dir):
-                    source_path = os.path.join(sub_dir, filename)
-                    dest_path = os.path.join(source_dir, filename)
-                    try:
-                        shutil.move(source_path, dest_path)
-                        reverted_count += 1
-                    except Exception as e:
-                         print(f"Error reverting {filename}: {e}")
+        engine = MoveEngine(governor, self.verify_moves)
+        try:
+            with engine:
+                for dir_name in all_folder_names:
+                    sub_dir = os.path.join(source_dir, dir_name)
+                    if os.path.isdir(sub_dir):
+                        for filename in os.listdir(sub_dir):
+                            group_dir = os.path.join(sub_dir, filename)
+                            if dir_name in image_folder_names and self.is_similar_group(filename) and os.path.isdir(group_dir):
+                                for group_filename in os.listdir(group_dir):
+                                    try:
+                                        engine.move(group_dir, group_filename, source_dir)
+                                        reverted_count += 1
+                                    except Exception as e:
+                                        print(f"Error reverting {group_filename}: {e}")
+                                engine.release_dir(group_dir)
+                                try:
+                                    os.rmdir(group_dir)
+                                except OSError:
+                                    pass
+                                continue
+                            try:
+                                engine.move(sub_dir, filename, source_dir)
+                                reverted_count += 1
+                            except Exception as e:
+                                 print(f"Error reverting {filename}: {e}")
 
-                if not os.listdir(sub_dir):
-                    try:
-                        os.rmdir(sub_dir)
-                    except OSError:
-                        pass 
-        
-        QMessageBox.information(self, "Done", f"Revert complete. Moved back {reverted_count} files.")
+                        engine.release_dir(sub_dir)
+                        if not os.listdir(sub_dir):
+                            try:
+                                os.rmdir(sub_dir)
+                            except OSError:
+                                pass 
+        finally:
+            self.save_report('revert', source_dir, engine.report)
+        return f"Revert complete. Moved back {reverted_count} files."
+
+    def get_extension_map(self, translated_folder_names):
+        extension_to_folder = {}
+        for category, extensions in self.FILE_CATEGORIES.items():
+            folder_name = translated_folder_names[category]
+            for ext in extensions:
+                extension_to_folder[ext] = folder_name
+        return extension_to_folder
+
+    def create_governor(self, off_peak=False):
+        window_start, window_end = (self.offpeak_start, self.offpeak_end) if off_peak else (None, None)
+        if not self.io_throttle:
+            return IOGovernor(window_start=window_start, window_end=window_end)
+        return IOGovernor(self.io_max_ops, self.io_max_bytes, self.io_low_priority, window_start, window_end)
+
+    def group_images(self, engine, images_dir):
+        lang_texts = self.translations[self.current_language]
+        readable_formats = {bytes(fmt).decode().lower() for fmt in QImageReader.supportedImageFormats()}
+        try:
+            with os.scandir(images_dir) as it:
+                image_paths = [entry.path for entry in it
+                               if entry.is_file() and os.path.splitext(entry.name)[1][1:].lower() in readable_formats]
+        except OSError as e:
+            print(f"Error listing {images_dir}: {e}")
+            return
+
+        cache_path = os.path.join(os.path.dirname(get_settings_path()), 'image_hashes.json')
+        grouper = ImageGrouper(self.similar_threshold, cache_path)
+        groups = grouper.group(grouper.compute_hashes(image_paths))
+        try:
+            grouper.save_cache()
+        except OSError as e:
+            print(f"Error saving image hash cache: {e}")
+
+        group_number = 1
+        for members in groups:
+            while os.path.exists(os.path.join(images_dir, lang_texts['similar_group'].format(n=group_number))):
+                group_number += 1
+            group_dir = os.path.join(images_dir, lang_texts['similar_group'].format(n=group_number))
+            try:
+                os.makedirs(group_dir)
+            except OSError as e:
+                print(f"Error creating {group_dir}: {e}")
+                continue
+            for path in members:
+                try:
+                    engine.move(images_dir, os.path.basename(path), group_dir)
+                except Exception as e:
+                    print(f"Error grouping {path}: {e}")
+
+    def is_similar_group(self, dir_name):
+        for lang_data in self.translations.values():
+            prefix, suffix = lang_data['similar_group'].split('{n}')
+            if dir_name.startswith(prefix) and dir_name.endswith(suffix) and dir_name[len(prefix):len(dir_name) - len(suffix)].isdigit():
+                return True
+        return False
+
+    def save_report(self, operation, source_dir, verified_files):
+        if not verified_files:
+            return
+        reports_dir = os.path.join(os.path.dirname(get_settings_path()), 'reports')
+        if not os.path.exists(reports_dir):
+            os.makedirs(reports_dir)
+
+        now = datetime.now()
+        report = {
+            'operation': operation,
+            'source_dir': source_dir,
+            'finished': now.isoformat(timespec='seconds'),
+            'verified_files': verified_files,
+        }
+        report_path = os.path.join(reports_dir, f"{operation}_{now.strftime('%Y%m%d_%H%M%S')}.json")
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=4)
+
+    def run_when_allowed(self, source_dir, job):
+        lang_texts = self.translations[self.current_language]
+        if (self.job_worker and self.job_worker.isRunning()) or self.scheduled_timer.isActive():
+            QMessageBox.warning(self, "Error", lang_texts['job_busy'])
+            return
+
+        large_job = False
+        if self.offpeak_only:
+            # Jobs only touch the top level and the category folders, so the top level is what makes a job large
+            try:
+                with os.scandir(source_dir) as it:
+                    large_job = sum(1 for _ in it) >= self.offpeak_min_files
+            except OSError:
+                pass
+
+        # A large job is paused by its governor whenever it runs past the end of the window
+        governor = self.create_governor(off_peak=large_job)
+        if not governor.in_window():
+            QMessageBox.information(self, lang_texts['scheduled_title'],
+                                    lang_texts['scheduled_msg'].format(start=self.offpeak_start))
+            self.scheduled_timer.timeout.connect(lambda: self.start_job(job, governor))
+            self.scheduled_timer.start(int(governor.seconds_until_window() * 1000))
+            return
+        self.start_job(job, governor)
+
+    def start_job(self, job, governor):
+        try:
+            self.scheduled_timer.timeout.disconnect()
+        except TypeError:
+            pass
+        self.btn_sort.setEnabled(False)
+        self.btn_revert.setEnabled(False)
+        self.job_worker = JobWorker(job, governor)
+        self.job_worker.job_finished.connect(self.job_done)
+        self.job_worker.start()
+
+    def job_done(self, title, message):
+        self.btn_sort.setEnabled(True)
+        self.btn_revert.setEnabled(True)
+        if title == "Done":
+            QMessageBox.information(self, title, message)
+        else:
+            QMessageBox.warning(self, title, message)
+
+    def closeEvent(self, event):
+        self.scheduled_timer.stop()
+        if self.job_worker and self.job_worker.isRunning():
+            self.job_worker.stop()
+            self.job_worker.wait()
+        super().closeEvent(event)
 
     def toggle_unknown(self, checked):
         self.create_unknown = checked
@@ -724,6 +1961,22 @@ class FileSorter(QWidget):
         self.create_folders = checked
         self.save_settings()
 
+    def toggle_throttle(self, checked):
+        self.io_throttle = checked
+        self.save_settings()
+
+    def toggle_offpeak(self, checked):
+        self.offpeak_only = checked
+        self.save_settings()
+
+    def toggle_verify(self, checked):
+        self.verify_moves = checked
+        self.save_settings()
+
+    def toggle_similar(self, checked):
+        self.group_similar_images = checked
+        self.save_settings()
+
     def load_settings(self):
         settings_path = get_settings_path()
         if os.path.exists(settings_path):
@@ -732,6 +1985,24 @@ class FileSorter(QWidget):
                     settings = json.load(f)
                     self.create_unknown = settings.get('create_unknown', False)
                     self.create_folders = settings.get('create_folders', False)
+                    self.io_throttle = settings.get('io_throttle', False)
+                    self.io_max_ops = settings.get('io_max_ops', self.io_max_ops)
+                    self.io_max_bytes = settings.get('io_max_bytes', self.io_max_bytes)
+                    self.io_low_priority = settings.get('io_low_priority', self.io_low_priority)
+                    self.offpeak_only = settings.get('offpeak_only', False)
+                    offpeak_start = settings.get('offpeak_start', self.offpeak_start)
+                    offpeak_end = settings.get('offpeak_end', self.offpeak_end)
+                    try:
+                        IOGovernor.parse_time(offpeak_start)
+                        IOGovernor.parse_time(offpeak_end)
+                        self.offpeak_start = offpeak_start
+                        self.offpeak_end = offpeak_end
+                    except ValueError:
+                        print(f"Ignoring invalid off-peak window {offpeak_start} - {offpeak_end}")
+                    self.offpeak_min_files = settings.get('offpeak_min_files', self.offpeak_min_files)
+                    self.verify_moves = settings.get('verify_moves', False)
+                    self.group_similar_images = settings.get('group_similar_images', False)
+                    self.similar_threshold = settings.get('similar_threshold', self.similar_threshold)
                 except json.JSONDecodeError:
                     pass
 
@@ -747,6 +2018,17 @@ class FileSorter(QWidget):
         
         settings['create_unknown'] = self.create_unknown
         settings['create_folders'] = self.create_folders
+        settings['io_throttle'] = self.io_throttle
+        settings['io_max_ops'] = self.io_max_ops
+        settings['io_max_bytes'] = self.io_max_bytes
+        settings['io_low_priority'] = self.io_low_priority
+        settings['offpeak_only'] = self.offpeak_only
+        settings['offpeak_start'] = self.offpeak_start
+        settings['offpeak_end'] = self.offpeak_end
+        settings['offpeak_min_files'] = self.offpeak_min_files
+        settings['verify_moves'] = self.verify_moves
+        settings['group_similar_images'] = self.group_similar_images
+        settings['similar_threshold'] = self.similar_threshold
         
         with open(settings_path, 'w') as f:
             json.dump(settings, f, indent=4)